@@ -5,9 +5,21 @@ import requests
 
 from pdpyras import APISession, PDClientError
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
 BASE_URL = "https://api.pagerduty.com"
 
 
+def _dumps(data):
+    """Serializes a request body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data)
+
+
 class PDSchedulingException(Exception):
     def __init__(self, message, extra_info=None):
         super().__init__(message)
@@ -124,7 +136,7 @@ class PagerDuty:
             result = requests.post(
                 url=f"{BASE_URL}/schedules",
                 headers=self.headers(),
-                data=json.dumps(data),
+                data=_dumps(data),
             )
             result.raise_for_status()
         except requests.RequestException as e:
@@ -154,7 +166,7 @@ class PagerDuty:
             result = requests.put(
                 url=f"{BASE_URL}/schedules/{schedule_id}",
                 headers=self.headers(),
-                data=json.dumps(data),
+                data=_dumps(data),
             )
             result.raise_for_status()
         except requests.RequestException as e:
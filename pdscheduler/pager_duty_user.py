@@ -35,3 +35,7 @@ class PagerDutyUser:
             return self.id == other.id
 
         return False
+
+    def __hash__(self):
+        """Hash based on user ID, consistent with equality."""
+        return hash(self.id)
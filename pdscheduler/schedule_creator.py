@@ -1,12 +1,28 @@
-import time
-from typing import List
+from typing import List, Tuple
 import datetime
+import collections
 import csv
 
 from pdscheduler.pager_duty_user import PagerDutyUser
 
+CSV_COLUMNS = ["user_email", "week_day", "start_time", "end_time"]
+
+# Read the restrictions file in 1 MiB chunks to keep syscalls low on large rosters
+CSV_READ_BUFFER_SIZE = 1 << 20
+
 
 class ScheduleCreator:
+    # PagerDuty numbers weekdays 1-7 (Monday-Sunday)
+    _WEEKDAY_TO_NUM = {
+        "Monday": 1,
+        "Tuesday": 2,
+        "Wednesday": 3,
+        "Thursday": 4,
+        "Friday": 5,
+        "Saturday": 6,
+        "Sunday": 7,
+    }
+    _RESTRICTION_TEMPLATE = {"type": "weekly_restriction"}
 
     def __init__(
         self,
@@ -29,6 +45,15 @@ class ScheduleCreator:
         self.users = users
         self.file_path = file_path
 
+        self._user_by_email = {user.email: user for user in users}
+        self._layer_by_user_id = {}
+        # Memo of CSV weekday spellings (e.g. "monday", "MONDAY") to PagerDuty day
+        # numbers. Only valid weekdays are stored, and the memo lives as long as the
+        # creator since the mapping never changes between generate_data() calls.
+        self._weekday_nums = {}
+        # Memo of valid HH:MM strings to seconds since midnight, same lifetime
+        self._time_seconds = {}
+
         self.schedule = {}
 
     def validate(self):
@@ -51,11 +76,11 @@ class ScheduleCreator:
 
     def _validate_csv_file(self):
         try:
-            with open(self.file_path, "r") as file:
+            with open(self.file_path, "r", newline="") as file:
                 csv_reader = csv.reader(file)
                 # Check if the first row is a header
                 header = next(csv_reader)
-                if header != ["user_email", "week_day", "start_time", "end_time"]:
+                if header != CSV_COLUMNS:
                     raise ValueError(
                         "CSV file must have the following headers: Email, Weekday, Start Time, End Time"
                     )
@@ -80,62 +105,114 @@ class ScheduleCreator:
         }
 
     def _generate_layers(self):
-        self.schedule["schedule_layers"] = [
-            {
+        # All layers share the same start so they line up with each other
+        # Naive UTC keeps isoformat() at "%Y-%m-%dT%H:%M:%S" without an offset
+        now = datetime.datetime.now(datetime.timezone.utc).replace(
+            tzinfo=None, microsecond=0
+        )
+        start = now.isoformat()
+        end = (now + datetime.timedelta(weeks=1)).isoformat()
+
+        layers = self.schedule["schedule_layers"] = []
+        self._layer_by_user_id = {}
+        for user in self.users:
+            layer = {
                 "name": f"Layer for {user.name}",
-                "start": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()),
-                "end": (
-                    datetime.datetime.now(datetime.timezone.utc)
-                    + datetime.timedelta(weeks=1)
-                ).strftime("%Y-%m-%dT%H:%M:%S"),
-                "rotation_virtual_start": time.strftime(
-                    "%Y-%m-%dT%H:%M:%S", time.gmtime()
-                ),
+                "start": start,
+                "end": end,
+                "rotation_virtual_start": start,
                 "users": [{"user": {"id": user.id, "type": "user"}}],
                 "rotation_turn_length_seconds": 3600,  # one hour
                 "restrictions": [],
             }
-            for user in self.users
-        ]
+            layers.append(layer)
+            # Restrictions go to the first layer of a user listed more than once
+            self._layer_by_user_id.setdefault(user.id, layer)
 
     def generate_restrictions(self):
-        with open(self.file_path, "r") as file:
+        if not self.file_path:
+            return
+
+        rows = self._read_restriction_rows()
+
+        rows_by_email = collections.defaultdict(list)
+        for row in rows:
+            # Columns beyond the four known ones are ignored
+            rows_by_email[row[0]].append((row[1], row[2], row[3]))
+
+        for email, user_rows in rows_by_email.items():
+            user = self._get_user_by_email(email)
+            # Add restrictions to the user's schedule layer
+            self._layer_by_user_id[user.id]["restrictions"].extend(
+                self._create_user_restrictions(user_rows)
+            )
+
+    def _create_user_restrictions(self, rows):
+        # Skip identical windows, e.g. from CSVs merged from several sources
+        windows = dict.fromkeys(
+            self._parse_window(weekday, start_time, end_time)
+            for weekday, start_time, end_time in rows
+        )
+
+        restrictions = []
+        for start_day_of_week, start_time_of_day, duration_seconds in windows:
+            restriction = self._RESTRICTION_TEMPLATE.copy()
+            restriction["start_day_of_week"] = start_day_of_week
+            restriction["start_time_of_day"] = start_time_of_day
+            restriction["duration_seconds"] = duration_seconds
+            restrictions.append(restriction)
+
+        return restrictions
+
+    def _read_restriction_rows(self):
+        with open(
+            self.file_path, "r", buffering=CSV_READ_BUFFER_SIZE, newline=""
+        ) as file:
             csv_reader = csv.reader(file)
             # Skip the header (first row)
             next(csv_reader)
 
-            for row in csv_reader:
-                user = self._get_user_by_email(row[0])
-                self._add_restriction(user, row[1], row[2], row[3])
-
-    def _add_restriction(
-        self, user: PagerDutyUser, weekday: str, start_time: str, end_time: str
-    ):
-        # Find schedule belonging to user
-        for layer in self.schedule["schedule_layers"]:
-            if layer["users"][0]["user"]["id"] == user.id:
-                # Add restriction to the user's schedule layer
-                restriction = {
-                    "type": "weekly_restriction",
-                    "start_day_of_week": time.strptime(
-                        weekday.capitalize(), "%A"
-                    ).tm_wday
-                    + 1,  # Convert weekday to 1-7 (Monday-Sunday)
-                    "start_time_of_day": f"{start_time}:00",
-                    "duration_seconds": (
-                        datetime.datetime.strptime(end_time, "%H:%M")
-                        - datetime.datetime.strptime(start_time, "%H:%M")
-                    ).seconds,
-                }
-                layer["restrictions"].append(restriction)
-                break
+            return list(csv_reader)
+
+    def _parse_window(
+        self, weekday: str, start_time: str, end_time: str
+    ) -> Tuple[int, str, int]:
+        start_day_of_week = self._weekday_nums.get(weekday)
+        if start_day_of_week is None:
+            try:
+                start_day_of_week = self._weekday_nums[weekday] = self._WEEKDAY_TO_NUM[
+                    weekday.capitalize()
+                ]
+            except KeyError:
+                raise ValueError(f"Invalid weekday in CSV: {weekday!r}") from None
+        start_seconds = self._time_seconds.get(start_time)
+        if start_seconds is None:
+            start_seconds = self._time_seconds[start_time] = self._parse_time_of_day(
+                start_time
+            )
+        end_seconds = self._time_seconds.get(end_time)
+        if end_seconds is None:
+            end_seconds = self._time_seconds[end_time] = self._parse_time_of_day(
+                end_time
+            )
+        # Shifts ending before they start wrap around midnight
+        duration_seconds = (end_seconds - start_seconds) % 86400
+        return start_day_of_week, f"{start_time}:00", duration_seconds
+
+    @staticmethod
+    def _parse_time_of_day(value: str) -> int:
+        """Return the seconds since midnight of an HH:MM time."""
+        parts = value.split(":")
+        if len(parts) != 2 or not all(
+            part.isascii() and part.isdigit() for part in parts
+        ):
+            raise ValueError(f"Invalid time in CSV: {value!r}")
+
+        hours, minutes = int(parts[0]), int(parts[1])
+        if not (0 <= hours < 24 and 0 <= minutes < 60):
+            raise ValueError(f"Invalid time in CSV: {value!r}")
+
+        return hours * 3600 + minutes * 60
 
     def _get_user_by_email(self, email: str) -> PagerDutyUser:
-        for user in self.users:
-            if user.email == email:
-                return user
-
-        return None
-
-    def _get_remaining_users(self, user: PagerDutyUser) -> List[PagerDutyUser]:
-        return [u for u in self.users if u != user]
+        return self._user_by_email.get(email)
@@ -1,28 +1,37 @@
 import os
-from typing import Dict, List, Optional, Set, Union
+import time
+from typing import Dict, FrozenSet, List, Optional, Union
 
 import pytz
 from pdscheduler.pager_duty import PagerDuty
 from pdscheduler.pager_duty_user import PagerDutyUser
 from pdscheduler.schedule_creator import ScheduleCreator
 
+# PagerDuty rate limits the API, so fetched users are reused for a short while
+USERS_CACHE_TTL_SECONDS = 60
+
 
 class PagerDutyScheduler:
-    VALID_DAYS: Set[str] = {
-        "monday",
-        "tuesday",
-        "wednesday",
-        "thursday",
-        "friday",
-        "saturday",
-        "sunday",
-    }
+    VALID_DAYS: FrozenSet[str] = frozenset(
+        {
+            "monday",
+            "tuesday",
+            "wednesday",
+            "thursday",
+            "friday",
+            "saturday",
+            "sunday",
+        }
+    )
 
     def __init__(self, token: str):
         self.token = token
         self.pager_duty = PagerDuty(self.token)
         self.days: List[str] = []
         self.users: List[PagerDutyUser] = []
+        self._users_cache: List[PagerDutyUser] = []
+        self._users_cache_ts: Optional[float] = None
+        self._users_cache_teams: Optional[tuple] = None
         self.start_hour: int = 0
         self.end_hour: int = 23
         self.name: str = "Automatic Schedule"
@@ -57,17 +66,38 @@ class PagerDutyScheduler:
         """
         self.description = description
 
-    def set_users_from_pager_duty(self, teams: Optional[List[str]] = None) -> None:
+    def set_users_from_pager_duty(
+        self, teams: Optional[List[str]] = None, refresh: bool = False
+    ) -> None:
         """
         Fetch users from PagerDuty and store them in the scheduler.
 
+        Users fetched for the same teams within the last minute are reused instead
+        of being requested again. Pass refresh=True to always fetch them again,
+        e.g. after changing users in PagerDuty.
+
         Args:
             teams (Optional[List[str]]): A list of team IDs to filter users by. If None, fetches all users.
+            refresh (bool): Whether to skip the cached users and fetch them again.
 
         Returns:
             None
         """
-        self.users = [PagerDutyUser(user) for user in self.pager_duty.get_users(teams)]
+        teams_key = tuple(teams) if teams else None
+        cache_is_fresh = (
+            not refresh
+            and self._users_cache_ts is not None
+            and time.monotonic() - self._users_cache_ts < USERS_CACHE_TTL_SECONDS
+            and self._users_cache_teams == teams_key
+        )
+        if not cache_is_fresh:
+            self._users_cache = [
+                PagerDutyUser(user) for user in self.pager_duty.get_users(teams)
+            ]
+            self._users_cache_ts = time.monotonic()
+            self._users_cache_teams = teams_key
+
+        self.users = self._users_cache.copy()
 
     def get_users(self) -> List[PagerDutyUser]:
         """
@@ -92,6 +122,8 @@ class PagerDutyScheduler:
         if isinstance(user_ids, str):
             user_ids = [user_ids]
 
+        user_ids = set(user_ids)
+
         self.users = [user for user in self.users if user.id in user_ids]
 
     def exclude_users_from_schedule(self, user_ids: Union[str, List[str]]) -> None:
@@ -107,6 +139,7 @@ class PagerDutyScheduler:
 
         if isinstance(user_ids, str):
             user_ids = [user_ids]
+        user_ids = set(user_ids)
 
         self.users = [user for user in self.users if user.id not in user_ids]
 
@@ -124,9 +157,9 @@ class PagerDutyScheduler:
             None
         """
 
-        lower_days = [day.lower() for day in days]
+        lower_days = list(map(str.lower, days))
 
-        invalid_days = [day for day in lower_days if day not in self.VALID_DAYS]
+        invalid_days = sorted(set(lower_days) - self.VALID_DAYS)
         if invalid_days:
             raise ValueError(
                 f"Invalid day(s) provided: {', '.join(invalid_days)}. Days must be valid weekdays."